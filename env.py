@@ -0,0 +1,30 @@
+"""
+Environment Setup
+
+Loads API keys from a .env file once per process, however many scripts ask for them.
+
+Key Concepts:
+- python-dotenv copies the .env file into os.environ, so SDK clients pick the keys up too
+- functools.cache means the file is only ever read and parsed once
+"""
+
+import os
+from functools import cache
+from dotenv import load_dotenv
+
+API_KEY_NAMES = (
+    "OPENAI_API_KEY",
+    "ANTHROPIC_API_KEY",
+    "GOOGLE_API_KEY",
+    "DEEPSEEK_API_KEY",
+    "GROQ_API_KEY",
+    "GROK_API_KEY",
+    "OPENROUTER_API_KEY",
+)
+
+
+@cache
+def load_env():
+    """Load the .env file and return the API keys found (None for missing ones)."""
+    load_dotenv(override=True)
+    return {name: os.getenv(name) for name in API_KEY_NAMES}
@@ -10,21 +10,20 @@ Key Concepts:
 - Message format with roles (system and user)
 """
 
-import os
-from dotenv import load_dotenv
 from openai import OpenAI
+from env import load_env
+from llm_cache import cached_stream
 
 # If you get an error running this script, then please head over to the troubleshooting notebook!
 
 # ============================================================================
 # Environment Variables & API Key Setup
 # ============================================================================
-# Using python-dotenv to securely load API keys from a .env file.
+# Using python-dotenv (through env.load_env) to securely load API keys from a .env file.
 # The OpenAI() client automatically uses the OPENAI_API_KEY environment variable.
 
 # Load environment variables in a file called .env
-load_dotenv(override=True)
-api_key = os.getenv('OPENAI_API_KEY')
+api_key = load_env()["OPENAI_API_KEY"]
 
 # Check the key
 if not api_key:
@@ -43,9 +42,11 @@ message = "Hello, GPT! What is 1+1?"
 messages = [{"role": "user", "content": message}]
 
 # Hello World - User Prompt
+# The reply is streamed, so it starts printing as soon as the first words are generated
 openai_client = OpenAI()
-response = openai_client.chat.completions.create(model="gpt-4o-mini", messages=messages)
-print(response.choices[0].message.content)
+for text in cached_stream(openai_client, model="gpt-4o-mini", messages=messages):
+    print(text, end="", flush=True)
+print()
 
 # ============================================================================
 # System Prompts vs User Prompts
@@ -82,6 +83,7 @@ messages = [
     {"role": "user", "content": user_prompt}
 ]
 
-response = openai_client.chat.completions.create(model="gpt-4o-mini", messages=messages)
-print(response.choices[0].message.content)
+for text in cached_stream(openai_client, model="gpt-4o-mini", messages=messages):
+    print(text, end="", flush=True)
+print()
 
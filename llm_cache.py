@@ -0,0 +1,97 @@
+"""
+LLM Response Cache
+
+A small on-disk cache for chat completions, so that re-running a script with the
+same prompt returns the stored answer instead of making another API call.
+
+Key Concepts:
+- Cache keys are a SHA-256 hash of the model, messages and any other request parameters
+- Responses are stored as JSON (via model_dump) with diskcache, and expire after an hour
+- On a hit the stored JSON is turned back into a ChatCompletion, so callers don't notice
+- Streamed replies are cached too, and replayed in one piece on a hit
+"""
+
+import json
+from hashlib import sha256
+
+import diskcache
+from openai.types.chat import ChatCompletion
+
+CACHE_DIR = "./.llm_cache"
+CACHE_TTL = 3600  # seconds
+
+cache = diskcache.Cache(CACHE_DIR)
+
+
+def key(model, messages, **params):
+    """Build a stable cache key from the request parameters."""
+    payload = {"m": model, "msgs": messages, **params}
+    return sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def cached_create(client, **kwargs):
+    """Drop-in replacement for client.chat.completions.create(**kwargs) that caches the response."""
+    k = key(**kwargs)
+    hit = cache.get(k)
+    if hit is not None:
+        return ChatCompletion.model_validate(hit)
+
+    response = client.chat.completions.create(**kwargs)
+    cache.set(k, response.model_dump(mode="json"), expire=CACHE_TTL)
+    return response
+
+
+async def cached_acreate(client, **kwargs):
+    """Async version of cached_create, for AsyncOpenAI clients."""
+    k = key(**kwargs)
+    hit = cache.get(k)
+    if hit is not None:
+        return ChatCompletion.model_validate(hit)
+
+    response = await client.chat.completions.create(**kwargs)
+    cache.set(k, response.model_dump(mode="json"), expire=CACHE_TTL)
+    return response
+
+
+def cached_stream(client, **kwargs):
+    """
+    Stream the reply text of client.chat.completions.create(**kwargs), with caching.
+
+    On a miss the text is yielded piece by piece as the model generates it, and the
+    full reply is cached once the stream is finished. On a hit the stored reply is
+    yielded all at once.
+    """
+    k = key(**kwargs)
+    hit = cache.get(k)
+    if hit is not None:
+        yield ChatCompletion.model_validate(hit).choices[0].message.content
+        return
+
+    parts = []
+    last_chunk = None
+    finish_reason = "stop"
+    for chunk in client.chat.completions.create(stream=True, **kwargs):
+        last_chunk = chunk
+        if not chunk.choices:
+            continue
+        if chunk.choices[0].finish_reason:
+            finish_reason = chunk.choices[0].finish_reason
+        if chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+
+    if last_chunk is None:
+        return
+    # Store it in the same shape as a non-streamed response, so cached_create can use it too
+    completion = {
+        "id": last_chunk.id,
+        "object": "chat.completion",
+        "created": last_chunk.created,
+        "model": last_chunk.model,
+        "choices": [{
+            "index": 0,
+            "finish_reason": finish_reason,
+            "message": {"role": "assistant", "content": "".join(parts)},
+        }],
+    }
+    cache.set(k, completion, expire=CACHE_TTL)
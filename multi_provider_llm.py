@@ -22,7 +22,7 @@ The script covers integration with the following LLM providers:
 2. Client Initialization: Sets up clients for multiple providers using OpenAI-compatible endpoints
 3. Unified Interface: Demonstrates how to use the OpenAI client library with different base URLs
 4. Native SDKs: Shows examples using provider-specific native SDKs (Google Gemini and Anthropic)
-5. Practical Example: Tests all providers with a simple joke-telling task
+5. Practical Example: Tests all providers concurrently with a simple joke-telling task
 
 ## Usage
 
@@ -37,29 +37,36 @@ The script covers integration with the following LLM providers:
 - google-generativeai
 - anthropic
 - requests
+- httpx[http2]
+- aiolimiter
+- tenacity
 """
 
-import os
-import subprocess
+import asyncio
+from functools import cache
+import httpx
 import requests
-from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from aiolimiter import AsyncLimiter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from google import genai
 from anthropic import Anthropic
+from env import load_env
+from ollama_models import ensure_model
 
 
 # ============================================================================
 # API Key Setup
 # ============================================================================
 
-load_dotenv(override=True)
-openai_api_key = os.getenv('OPENAI_API_KEY')
-anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
-google_api_key = os.getenv('GOOGLE_API_KEY')
-deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-groq_api_key = os.getenv('GROQ_API_KEY')
-grok_api_key = os.getenv('GROK_API_KEY')
-openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
+api_keys = load_env()
+openai_api_key = api_keys["OPENAI_API_KEY"]
+anthropic_api_key = api_keys["ANTHROPIC_API_KEY"]
+google_api_key = api_keys["GOOGLE_API_KEY"]
+deepseek_api_key = api_keys["DEEPSEEK_API_KEY"]
+groq_api_key = api_keys["GROQ_API_KEY"]
+grok_api_key = api_keys["GROK_API_KEY"]
+openrouter_api_key = api_keys["OPENROUTER_API_KEY"]
 
 if openai_api_key:
     print(f"OpenAI API Key found: {openai_api_key[:8]}...")
@@ -101,11 +108,19 @@ else:
 # Client Setup
 # ============================================================================
 
+# One shared HTTP connection pool for every provider.
+# Connections (and their TLS sessions) are kept alive and reused between calls,
+# and HTTP/2 lets several requests to the same host share one connection.
+
+shared_http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=30.0,
+)
+
 # Connect to OpenAI client library
 # A thin wrapper around calls to HTTP endpoints
 
-openai = OpenAI()
-
 # For Gemini, DeepSeek and Groq, we can use the OpenAI python client
 # Because Google and DeepSeek have endpoints compatible with OpenAI
 # And OpenAI allows you to change the base_url
@@ -118,13 +133,29 @@ grok_url = "https://api.x.ai/v1"
 openrouter_url = "https://openrouter.ai/api/v1"
 ollama_url = "http://localhost:11434/v1"
 
-anthropic = OpenAI(api_key=anthropic_api_key, base_url=anthropic_url)
-gemini = OpenAI(api_key=google_api_key, base_url=gemini_url)
-deepseek = OpenAI(api_key=deepseek_api_key, base_url=deepseek_url)
-groq = OpenAI(api_key=groq_api_key, base_url=groq_url)
-grok = OpenAI(api_key=grok_api_key, base_url=grok_url)
-openrouter = OpenAI(base_url=openrouter_url, api_key=openrouter_api_key)
-ollama = OpenAI(api_key="ollama", base_url=ollama_url)
+# (api_key, base_url) per provider; None means the OpenAI defaults
+CLIENT_CONFIG = {
+    "OpenAI": (openai_api_key, None),
+    "Anthropic": (anthropic_api_key, anthropic_url),
+    "Google Gemini": (google_api_key, gemini_url),
+    "Groq": (groq_api_key, groq_url),
+    "DeepSeek": (deepseek_api_key, deepseek_url),
+    "Grok": (grok_api_key, grok_url),
+    "OpenRouter": (openrouter_api_key, openrouter_url),
+    "Ollama": ("ollama", ollama_url),
+}
+
+
+# Clients are only built the first time a provider is actually called,
+# so providers that are never used cost nothing at startup
+@cache
+def get_client(name):
+    """Return the AsyncOpenAI client for a provider, creating it on first use."""
+    api_key, base_url = CLIENT_CONFIG[name]
+    # Retries are left to call() below, so every attempt goes through the rate limiter
+    return AsyncOpenAI(
+        api_key=api_key, base_url=base_url, http_client=shared_http_client, max_retries=0
+    )
 
 
 # ============================================================================
@@ -137,83 +168,130 @@ tell_a_joke = [
 
 
 # ============================================================================
-# OpenAI
-# ============================================================================
-
-print("\n" + "="*80)
-print("OpenAI")
-print("="*80)
-response = openai.chat.completions.create(model="gpt-4.1-mini", messages=tell_a_joke)
-print(response.choices[0].message.content)
-
-
-# ============================================================================
-# Anthropic
-# ============================================================================
-
-print("\n" + "="*80)
-print("Anthropic")
-print("="*80)
-response = anthropic.chat.completions.create(model="claude-sonnet-4-5-20250929", messages=tell_a_joke)
-print(response.choices[0].message.content)
-
-
-# ============================================================================
-# Google Gemini
+# Concurrent Provider Calls
 # ============================================================================
-
-print("\n" + "="*80)
-print("Google Gemini")
-print("="*80)
-response = gemini.chat.completions.create(model="gemini-2.5-pro", messages=tell_a_joke)
-print(response.choices[0].message.content)
+# Every provider call spends almost all of its time waiting on the network.
+# Firing them together with asyncio.gather means the total wall time is that of
+# the slowest provider, rather than the sum of all of them.
+
+PROVIDERS = [
+    ("OpenAI", "gpt-4.1-mini"),
+    ("Anthropic", "claude-sonnet-4-5-20250929"),
+    ("Google Gemini", "gemini-2.5-pro"),
+    ("Groq", "openai/gpt-oss-120b"),
+    ("DeepSeek", "deepseek-reasoner"),
+    ("Grok", "grok-4"),
+    ("Ollama", "llama3.2"),
+]
 
 
 # ============================================================================
-# Groq
+# Rate Limiting
 # ============================================================================
-
-print("\n" + "="*80)
-print("Groq")
-print("="*80)
-response = groq.chat.completions.create(model="openai/gpt-oss-120b", messages=tell_a_joke)
-print(response.choices[0].message.content)
+# Sending many prompts to every provider at once will hit their rate limits.
+# Each provider gets a requests-per-minute budget (AsyncLimiter) and a cap on how
+# many requests are in flight at a time (Semaphore). Calls that still fail in a
+# temporary way are retried. That covers connection errors and timeouts, 408, 409,
+# 429 and any 5xx, the same set the OpenAI SDK retries on its own. A retry waits
+# for the server's Retry-After if it sent one. Otherwise it uses exponential
+# backoff plus jitter, so retries from concurrent calls don't all land at once.
+# The clients' own retries are switched off (max_retries=0), so this is the only
+# retry layer and each retry takes a fresh slot from the limiter.
+
+REQUESTS_PER_MINUTE = {
+    "OpenAI": 500,
+    "Anthropic": 200,
+    "Google Gemini": 150,
+    "Groq": 30,
+    "DeepSeek": 60,
+    "Grok": 60,
+    "OpenRouter": 60,
+    "Ollama": 600,
+}
+MAX_IN_FLIGHT = 8
+
+LIMITERS = {name: AsyncLimiter(rpm, 60) for name, rpm in REQUESTS_PER_MINUTE.items()}
+SEMAPHORES = {name: asyncio.Semaphore(MAX_IN_FLIGHT) for name in REQUESTS_PER_MINUTE}
+
+
+MAX_RETRY_AFTER = 60  # seconds; longer Retry-After values are capped to this
+
+backoff = wait_exponential_jitter(max=30)
+
+
+def is_retryable(error):
+    """Connection problems, timeouts, rate limiting and server errors are worth retrying."""
+    # APITimeoutError is a subclass of APIConnectionError
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and (
+        error.status_code in (408, 409, 429) or error.status_code >= 500
+    )
+
+
+def wait_before_retry(retry_state):
+    """Wait as long as the server's Retry-After header asks, or back off exponentially."""
+    error = retry_state.outcome.exception()
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        except (TypeError, ValueError):
+            pass  # missing, or given as an HTTP date
+    return backoff(retry_state)
+
+
+@retry(
+    retry=retry_if_exception(is_retryable),
+    wait=wait_before_retry,
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+async def call(name, model, messages):
+    """Send messages to one provider, within its rate limit, and return the reply text."""
+    # The limiter is entered on every attempt, because tenacity re-runs the whole call
+    async with SEMAPHORES[name], LIMITERS[name]:
+        response = await get_client(name).chat.completions.create(model=model, messages=messages)
+    return response.choices[0].message.content
 
 
-# ============================================================================
-# DeepSeek
-# ============================================================================
+async def run_all(messages):
+    """
+    Send the same messages to every provider at once.
 
-print("\n" + "="*80)
-print("DeepSeek")
-print("="*80)
-response = deepseek.chat.completions.create(model="deepseek-reasoner", messages=tell_a_joke)
-print(response.choices[0].message.content)
+    Returns a dict of provider name to reply text, or to the exception
+    raised if that provider's call failed.
+    """
+    results = await asyncio.gather(
+        *[call(name, model, messages) for name, model in PROVIDERS],
+        return_exceptions=True,
+    )
+    return dict(zip([name for name, _ in PROVIDERS], results))
 
 
-# ============================================================================
-# Grok
-# ============================================================================
+async def main():
+    """Ask every provider for a joke and print the replies in order."""
+    # Ollama needs the model pulled locally before it can answer (skipped if it already has it).
+    # If it isn't running, its call below simply reports the error.
+    try:
+        ensure_model("llama3.2")
+    except (requests.exceptions.ConnectionError, FileNotFoundError) as e:
+        print(f"Ollama not available: {e}")
 
-print("\n" + "="*80)
-print("Grok")
-print("="*80)
-response = grok.chat.completions.create(model="grok-4", messages=tell_a_joke)
-print(response.choices[0].message.content)
+    results = await run_all(tell_a_joke)
+    await shared_http_client.aclose()
 
+    for name, result in results.items():
+        print("\n" + "="*80)
+        print(name)
+        print("="*80)
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+        else:
+            print(result)
 
-# ============================================================================
-# Ollama
-# ============================================================================
 
-print("\n" + "="*80)
-print("Ollama")
-print("="*80)
-requests.get("http://localhost:11434/").content
-# Pull the model if not already available
-subprocess.run(["ollama", "pull", "llama3.2"], check=False)
-response = ollama.chat.completions.create(model="llama3.2", messages=tell_a_joke)
-print(response.choices[0].message.content)
+asyncio.run(main())
 
 
 # ============================================================================
@@ -223,11 +301,13 @@ print(response.choices[0].message.content)
 print("\n" + "="*80)
 print("Google Gemini (Native SDK)")
 print("="*80)
+# Streamed, so the reply prints as it is generated
 client = genai.Client()
-response = client.models.generate_content(
+for chunk in client.models.generate_content_stream(
     model="gemini-2.5-flash-lite", contents="tell a joke"
-)
-print(response.text)
+):
+    print(chunk.text or "", end="", flush=True)
+print()
 
 
 # ============================================================================
@@ -237,11 +317,14 @@ print(response.text)
 print("\n" + "="*80)
 print("Anthropic (Native SDK)")
 print("="*80)
+# Streamed, so the reply prints as it is generated
 client = Anthropic()
-response = client.messages.create(
+with client.messages.stream(
     model="claude-sonnet-4-5-20250929",
     messages=[{"role": "user", "content": "tell a joke"}],
     max_tokens=100
-)
-print(response.content[0].text)
+) as stream:
+    for text in stream.text_stream:
+        print(text, end="", flush=True)
+print()
 
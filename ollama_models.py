@@ -0,0 +1,30 @@
+"""
+Ollama Model Management
+
+Makes sure a model is available on the local Ollama server before it is used.
+
+Key Concepts:
+- GET /api/tags lists the models the server already has, answered in milliseconds
+- `ollama pull` is only run when the model is missing, instead of on every run
+"""
+
+import subprocess
+import requests
+
+OLLAMA_URL = "http://localhost:11434"
+
+
+def installed_models():
+    """Return the names (like 'llama3.2:latest') of the models on the local Ollama server."""
+    response = requests.get(f"{OLLAMA_URL}/api/tags")
+    return {model["name"] for model in response.json()["models"]}
+
+
+def ensure_model(model, check=False):
+    """Pull model with `ollama pull`, unless the local Ollama server already has it."""
+    # Ollama lists untagged models under their :latest tag
+    name = model if ":" in model else f"{model}:latest"
+    if name in installed_models():
+        return
+    print(f"Pulling {model} model...")
+    subprocess.run(["ollama", "pull", model], check=check)
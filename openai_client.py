@@ -4,17 +4,15 @@ OpenAI Client Examples
 Using the OpenAI Python client to interact with various LLM providers through a unified interface.
 """
 
-import os
-import subprocess
-from dotenv import load_dotenv
 from openai import OpenAI
+from env import load_env
+from ollama_models import ensure_model
 
 # ============================================================================
 # Imports
 # ============================================================================
 # Load environment variables and import OpenAI client.
-
-load_dotenv(override=True)
+# load_env() reads the .env file on first use and reuses the result afterwards.
 
 # ============================================================================
 # OpenAI API
@@ -23,7 +21,7 @@ load_dotenv(override=True)
 
 def test_openai():
     """Test OpenAI API client."""
-    api_key = os.getenv('OPENAI_API_KEY')
+    api_key = load_env()["OPENAI_API_KEY"]
     
     if not api_key:
         print("No API key was found!")
@@ -46,7 +44,7 @@ def test_openai():
 
 def test_gemini():
     """Test Google Gemini API via OpenAI client compatibility layer."""
-    google_api_key = os.getenv("GOOGLE_API_KEY")
+    google_api_key = load_env()["GOOGLE_API_KEY"]
     
     if not google_api_key:
         print("No Google API key was found!")
@@ -67,7 +65,7 @@ def test_gemini():
 # ============================================================================
 # Ollama - Llama 3.2
 # ============================================================================
-# Local Ollama instance with OpenAI-compatible API. Pulls Llama 3.2 model.
+# Local Ollama instance with OpenAI-compatible API. Pulls Llama 3.2 model if missing.
 
 def test_ollama_llama():
     """Test Ollama Llama 3.2 model via OpenAI client."""
@@ -75,9 +73,8 @@ def test_ollama_llama():
     
     ollama = OpenAI(base_url=OLLAMA_BASE_URL, api_key='ollama')
     
-    # Pull Llama model using OpenAI client
-    print("Pulling llama3.2 model...")
-    subprocess.run(["ollama", "pull", "llama3.2"], check=True)
+    # Pull Llama model, unless Ollama already has it
+    ensure_model("llama3.2", check=True)
     
     response = ollama.chat.completions.create(
         model="llama3.2", 
@@ -89,7 +86,7 @@ def test_ollama_llama():
 # ============================================================================
 # Ollama - Deepseek R1
 # ============================================================================
-# Using Deepseek R1 model via Ollama. Pulls the 1.5B parameter model.
+# Using Deepseek R1 model via Ollama. Pulls the 1.5B parameter model if missing.
 
 def test_ollama_deepseek():
     """Test Ollama Deepseek R1 model via OpenAI client."""
@@ -97,9 +94,8 @@ def test_ollama_deepseek():
     
     ollama = OpenAI(base_url=OLLAMA_BASE_URL, api_key='ollama')
     
-    # Deepseek model using OpenAI client
-    print("Pulling deepseek-r1:1.5b model...")
-    subprocess.run(["ollama", "pull", "deepseek-r1:1.5b"], check=True)
+    # Pull Deepseek model, unless Ollama already has it
+    ensure_model("deepseek-r1:1.5b", check=True)
     
     response = ollama.chat.completions.create(
         model="deepseek-r1:1.5b", 
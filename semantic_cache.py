@@ -0,0 +1,69 @@
+"""
+Semantic Summary Cache
+
+Remembers website summaries by what the page says rather than its exact bytes.
+A page that is nearly identical to one summarized before (a news homepage polled
+again a few minutes later) reuses the earlier summary instead of calling the LLM.
+
+Key Concepts:
+- Local sentence embeddings with sentence-transformers (all-MiniLM-L6-v2)
+- Cosine similarity as the inner product of normalized vectors
+- A shelve DB holding one entry per url: its latest summary, embedding and creation time
+- Hits must be for the same url and less than an hour old, since a homepage's
+  header and top headlines alone can look alike long after the news has moved on
+- Storing a url replaces its previous entry, so the cache never grows past one
+  entry per url and stale copies can't crowd out the fresh one
+"""
+
+import shelve
+import threading
+import time
+from functools import cache
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+DB_PATH = ".semantic_cache_by_url"
+CACHE_TTL = 3600  # seconds
+
+# embed() may be called from several worker threads at once; this makes sure the
+# model is only loaded by one of them
+_model_lock = threading.Lock()
+
+
+@cache
+def _model():
+    """Load the embedding model on first use."""
+    # Imported here because pulling in torch takes seconds, and scripts that never
+    # summarize anything shouldn't pay for it
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def embed(text):
+    """Embed text as a normalized (1, dim) vector, so inner product is cosine similarity."""
+    with _model_lock:
+        model = _model()
+    return model.encode([text], normalize_embeddings=True)
+
+
+def lookup(embedding, url):
+    """
+    Return the cached summary of a similar earlier version of url.
+
+    Returns None unless url's entry is younger than CACHE_TTL and has a cosine
+    similarity above SIMILARITY_THRESHOLD.
+    """
+    with shelve.open(DB_PATH) as db:
+        entry = db.get(url)
+    if entry is None or time.time() - entry["created"] >= CACHE_TTL:
+        return None
+    similarity = float(embedding[0] @ entry["embedding"][0])
+    if similarity <= SIMILARITY_THRESHOLD:
+        return None
+    return entry["summary"]
+
+
+def store(embedding, url, summary):
+    """Save a page's embedding and summary as the cache entry for url, replacing any older one."""
+    with shelve.open(DB_PATH) as db:
+        db[url] = {"summary": summary, "embedding": embedding, "created": time.time()}
@@ -10,10 +10,13 @@ Overview:
 - Practical examples with OpenAI's Chat API
 """
 
-import os
 import tiktoken
 from openai import OpenAI
-from dotenv import load_dotenv
+from env import load_env
+from llm_cache import cached_create
+
+# Loading the BPE tables takes a noticeable moment, so do it once per process
+_ENC = tiktoken.encoding_for_model("gpt-4o-mini")  # Note: notebook uses "gpt-4.1-mini"
 
 
 def basic_tokenization_example():
@@ -23,39 +26,38 @@ def basic_tokenization_example():
     Demonstrates basic tokenization using tiktoken. Encodes a simple string
     and examines how it's broken down into tokens.
     """
-    encoding = tiktoken.encoding_for_model("gpt-4o-mini")
-    tokens = encoding.encode("Testing Tokenomies")
+    tokens = _ENC.encode("Testing Tokenomies")
     
     print("Number of tokens:", len(tokens))
-    for i, token in enumerate(tokens):
-        print(f"Token {i}: {encoding.decode([token])}")
+    # Decode every token in one batched call rather than one call per token
+    pieces = _ENC.decode_batch([[token] for token in tokens])
+    for i, piece in enumerate(pieces):
+        print(f"Token {i}: {piece}")
 
 
-def calculate_input_tokens(messages, encoding):
+def calculate_input_tokens(messages, encoding=_ENC):
     """
     Calculate input tokens from a list of messages.
     
     Args:
         messages: List of message dictionaries with 'role' and 'content' keys
-        encoding: tiktoken encoding object
+        encoding: tiktoken encoding object (defaults to the cached gpt-4o-mini encoding)
         
     Returns:
         int: Number of input tokens
     """
-    input_text = ""
-    for message in messages:
-        input_text += message["role"] + ": " + message["content"] + "\n"
-    input_tokens = encoding.encode(input_text)
-    return len(input_tokens)
+    parts = [f"{message['role']}: {message['content']}\n" for message in messages]
+    input_tokens = encoding.encode_batch(parts, num_threads=8)
+    return sum(map(len, input_tokens))
 
 
-def calculate_output_tokens(text, encoding):
+def calculate_output_tokens(text, encoding=_ENC):
     """
     Calculate output tokens from response text.
     
     Args:
         text: Response text string
-        encoding: tiktoken encoding object
+        encoding: tiktoken encoding object (defaults to the cached gpt-4o-mini encoding)
         
     Returns:
         int: Number of output tokens
@@ -71,16 +73,15 @@ def openai_api_token_tracking_example():
     This function demonstrates how to:
     1. Set up OpenAI API client with environment variables
     2. Create a conversation with multiple messages
-    3. Calculate input tokens before making the API call
-    4. Make a chat completion request
-    5. Calculate output tokens from the response
+    3. Make a chat completion request
+    4. Read the exact input and output token counts from the response
     
-    Note: The token counting here is approximate. For exact token counts,
-    you can use the 'usage' field from the API response.
+    Note: The API already counts tokens exactly in the 'usage' field, so there
+    is no need to tokenize the prompt and response locally. Use
+    calculate_input_tokens() to estimate a prompt's size before sending it.
     """
     # Load environment variables
-    load_dotenv(override=True)
-    api_key = os.getenv('OPENAI_API_KEY')
+    api_key = load_env()["OPENAI_API_KEY"]
     
     if not api_key:
         print("No API key was found!")
@@ -99,15 +100,9 @@ def openai_api_token_tracking_example():
         {"role": "user", "content": "What's my name?"}
     ]
     
-    # Get encoding for token counting
-    encoding = tiktoken.encoding_for_model("gpt-4o-mini")  # Note: notebook uses "gpt-4.1-mini"
-    
-    # Calculate input tokens
-    input_tokens = calculate_input_tokens(messages, encoding)
-    print("Input tokens:", input_tokens)
-    
     # Make API call
-    response = openai.chat.completions.create(
+    response = cached_create(
+        openai,
         model="gpt-4o-mini",  # Note: notebook uses "gpt-4.1-mini"
         messages=messages
     )
@@ -116,16 +111,11 @@ def openai_api_token_tracking_example():
     response_content = response.choices[0].message.content
     print(f"Response: {response_content}")
     
-    # Calculate output tokens
-    output_tokens = calculate_output_tokens(response_content, encoding)
-    print("Output tokens:", output_tokens)
-    
-    # Note: For exact token counts, use response.usage
-    if hasattr(response, 'usage') and response.usage:
-        print(f"\nExact token usage from API:")
-        print(f"  Prompt tokens: {response.usage.prompt_tokens}")
-        print(f"  Completion tokens: {response.usage.completion_tokens}")
-        print(f"  Total tokens: {response.usage.total_tokens}")
+    # Exact token counts, as billed by the API
+    if response.usage:
+        print("Input tokens:", response.usage.prompt_tokens)
+        print("Output tokens:", response.usage.completion_tokens)
+        print("Total tokens:", response.usage.total_tokens)
     
     return response_content
 
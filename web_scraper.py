@@ -6,27 +6,32 @@ OpenAI's API for financial market insights.
 
 Key Concepts:
 - Environment variable management with python-dotenv
-- Web scraping with BeautifulSoup and requests
+- Web scraping with selectolax and httpx
+- Fetching and summarizing many pages concurrently with asyncio and httpx
 - OpenAI Chat API integration
 - Prompt engineering for structured outputs
 """
 
-import os
-from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-import requests
+import atexit
+import asyncio
+import shelve
+from selectolax.lexbor import LexborHTMLParser
+import httpx
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from llm_cache import cached_acreate, cached_stream
+from token_tracking import _ENC
+import semantic_cache
+from env import load_env
 
 # ============================================================================
 # Environment Variables & API Key Setup
 # ============================================================================
-# Using python-dotenv to securely load API keys from a .env file.
+# Using python-dotenv (through env.load_env) to securely load API keys from a .env file.
 # This keeps sensitive credentials out of code.
 
 # Load environment variables in a file called .env
-load_dotenv(override=True)
-api_key = os.getenv('OPENAI_API_KEY')
+api_key = load_env()["OPENAI_API_KEY"]
 
 # Check the key
 if not api_key:
@@ -39,7 +44,7 @@ else:
 # ============================================================================
 # System Prompt: Defines the AI's role and behavior (financial research assistant).
 # User Prompt: Provides context and instructions for each request.
-#              The prefix is combined with website content to form the complete user message.
+#              The prefix is sent just before the website content, as its own message.
 
 # Define our system prompt - you can experiment with this later,
 # changing the last sentence to 'Respond in markdown in Spanish.'
@@ -59,70 +64,264 @@ Here are the contents of a website.
 # ============================================================================
 # The messages_for() function creates the required message format:
 # - system role: Sets AI behavior
-# - user role: Contains the actual request with website content
+# - user role: The fixed instructions (user_prompt_prefix)
+# - user role: The website content, in its own message
 # This follows OpenAI's Chat Completions API structure.
+# Keeping every static part ahead of the website content means each request starts
+# with the same prefix, which is what the provider's prompt caching matches on.
 
 def messages_for(website):
     """Create message format for OpenAI API."""
     return [
         {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt_prefix + website}
+        {"role": "user", "content": user_prompt_prefix},
+        {"role": "user", "content": website}
     ]
 
 # ============================================================================
-# Web Scraping with BeautifulSoup
+# Web Scraping with selectolax
 # ============================================================================
 # Key techniques:
-# - requests.get(): Fetches HTML content (with User-Agent header to avoid blocking)
-# - BeautifulSoup: Parses HTML and extracts text
+# - httpx.Client: Fetches HTML content (with User-Agent header to avoid blocking) over one
+#   shared, kept-alive HTTP/2 connection pool, so repeat fetches from a site skip the TLS handshake
+# - httpx.AsyncClient: Fetches many pages at once (see fetch_website_contents_async)
+# - selectolax: Parses HTML and extracts text with the Lexbor C parser, which is much
+#   faster than BeautifulSoup because it doesn't build a Python object per tag
 # - decompose(): Removes irrelevant elements (scripts, styles, images)
-# - Text extraction: Gets clean text content, limited to 2000 characters
+# - Text extraction: Gets clean text content, dropping short, repeated and navigation
+#   lines, then keeps as many tokens as fit in the input budget next to the fixed prompts
+#   (input tokens are what the API charges for)
+# - Conditional GET: Sends the ETag / Last-Modified seen last time, so an unchanged page
+#   comes back as an empty 304 Not Modified and its stored text is reused without parsing
 
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
 }
 
-def fetch_website_contents(url):
-    """Fetch and extract text content from a website."""
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.content, "html.parser")
-    title = soup.title.string if soup.title else "No title found"
-    if soup.body:
-        for irrelevant in soup.body(["script", "style", "img", "input"]):
+# Shared by the sync session below and the async client made in summarize_many()
+http_client_settings = {
+    "headers": headers,
+    "http2": True,
+    "timeout": 10,
+    "follow_redirects": True,
+}
+
+http_session = httpx.Client(
+    **http_client_settings,
+    limits=httpx.Limits(max_keepalive_connections=20),
+)
+atexit.register(http_session.close)
+
+# The prompts never change, so their token count is worked out once here
+# rather than every time a page is trimmed to fit the budget
+MAX_INPUT_TOKENS = 1_000
+_STATIC_TOKENS = len(_ENC.encode(system_prompt)) + len(_ENC.encode(user_prompt_prefix))
+MAX_WEBSITE_TOKENS = MAX_INPUT_TOKENS - _STATIC_TOKENS
+MIN_LINE_LENGTH = 20
+NAVIGATION_PREFIXES = ("subscribe", "menu", "sign in")
+
+def meaningful_lines(text):
+    """Keep the lines that carry content: long enough, not navigation, not seen before."""
+    lines = (line for line in text.split("\n") if len(line) > MIN_LINE_LENGTH)
+    lines = (line for line in lines if not line.lower().startswith(NAVIGATION_PREFIXES))
+    return list(dict.fromkeys(lines))
+
+def extract_text(html):
+    """Extract the title and readable text from a page's HTML."""
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first("title")
+    title = title_node.text() if title_node else "No title found"
+    if tree.body:
+        for irrelevant in tree.body.css("script, style, img, input"):
             irrelevant.decompose()
-        text = soup.body.get_text(separator="\n", strip=True)
+        text = "\n".join(meaningful_lines(tree.body.text(separator="\n", strip=True)))
     else:
         text = ""
-    return (title + "\n\n" + text)[:2_000]
+    tokens = _ENC.encode(title + "\n\n" + text)[:MAX_WEBSITE_TOKENS]
+    # The cut can land inside a multi-byte character (accents, emoji, CJK). Dropping
+    # those stray bytes avoids a U+FFFD replacement character at the end of the prompt.
+    # The text before the cut is complete UTF-8, so nothing else is lost.
+    return _ENC.decode(tokens, errors="ignore")
+
+# url -> {"etag", "last_modified", "text", "extraction"} from the last 200 OK fetch
+PAGE_CACHE_PATH = ".page_cache"
+# Stored text is only reused if it was extracted with these same settings
+EXTRACTION_SETTINGS = (MAX_WEBSITE_TOKENS, MIN_LINE_LENGTH, NAVIGATION_PREFIXES)
+
+# Sent when asking again for a full page after an unusable 304
+FULL_PAGE_HEADERS = {"Cache-Control": "no-cache"}
+
+def stored_page(url):
+    """Return the stored entry for url, or None if there is none made with the current settings."""
+    with shelve.open(PAGE_CACHE_PATH) as db:
+        entry = db.get(url)
+    if entry is None or entry.get("extraction") != EXTRACTION_SETTINGS:
+        return None
+    return entry
+
+def conditional_headers(url):
+    """Build If-None-Match / If-Modified-Since headers from the last fetch of url."""
+    entry = stored_page(url)
+    # Without a usable copy of the text, ask for the full page instead of a 304
+    if entry is None:
+        return {}
+    conditional = {}
+    if entry["etag"]:
+        conditional["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        conditional["If-Modified-Since"] = entry["last_modified"]
+    return conditional
+
+def contents_from_response(url, response):
+    """
+    Extract the page text, or reuse the stored text if the server says it hasn't changed.
+
+    Returns None for a 304 when there is no usable stored text, so the caller
+    can ask for the full page again.
+    """
+    if response.status_code == 304:
+        entry = stored_page(url)
+        return entry["text"] if entry else None
+
+    text = extract_text(response.content)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    # Error and bot-block pages can carry validators too, but must never be reused
+    if response.status_code == 200 and (etag or last_modified):
+        with shelve.open(PAGE_CACHE_PATH) as db:
+            db[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "text": text,
+                "extraction": EXTRACTION_SETTINGS,
+            }
+    return text
+
+# A 304 can arrive with no usable stored text: the entry was replaced since the
+# request went out, or a server or proxy answered 304 without being asked.
+# In that case the page is fetched again in full. If even that comes back as 304,
+# raise_for_status() reports it rather than returning nothing.
+
+def fetch_website_contents(url):
+    """Fetch and extract text content from a website."""
+    response = http_session.get(url, headers=conditional_headers(url))
+    text = contents_from_response(url, response)
+    if text is None:
+        response = http_session.get(url, headers=FULL_PAGE_HEADERS)
+        text = contents_from_response(url, response)
+    if text is None:
+        response.raise_for_status()
+    return text
+
+async def fetch_website_contents_async(url, client):
+    """Fetch and extract text content from a website with a shared httpx.AsyncClient."""
+    response = await client.get(url, headers=conditional_headers(url))
+    text = contents_from_response(url, response)
+    if text is None:
+        response = await client.get(url, headers=FULL_PAGE_HEADERS)
+        text = contents_from_response(url, response)
+    if text is None:
+        response.raise_for_status()
+    return text
 
 # ============================================================================
 # OpenAI API Integration
 # ============================================================================
-# The summarize() function:
+# The stream_summary() function:
 # 1. Fetches website content
-# 2. Formats messages for the API
-# 3. Calls openai.chat.completions.create() with model and messages
-# 4. Returns the AI-generated analysis
+# 2. Checks the semantic cache: if a nearly identical version of the same page was
+#    summarized in the last hour (cosine similarity > 0.92), that summary is returned
+#    without calling the API.
+#    Only the website text is embedded, since the prompts around it never change.
+# 3. Formats messages for the API
+# 4. Calls openai.chat.completions.create() with stream=True (through llm_cache,
+#    so an identical request made again within the hour is answered from disk)
+# 5. Yields the AI-generated analysis piece by piece as it is generated
 # Model: gpt-4o-mini (corrected from gpt-4.1-mini)
 
-def summarize(url):
-    """Summarize website content using OpenAI API."""
+def stream_summary(url):
+    """Summarize website content using OpenAI API, yielding the text as it arrives."""
     website = fetch_website_contents(url)
-    response = openai.chat.completions.create(
+    embedding = semantic_cache.embed(website)
+    summary = semantic_cache.lookup(embedding, url)
+    if summary is not None:
+        yield summary
+        return
+
+    parts = []
+    for text in cached_stream(openai, model="gpt-4o-mini", messages=messages_for(website)):
+        parts.append(text)
+        yield text
+    summary = "".join(parts)
+    if summary:
+        semantic_cache.store(embedding, url, summary)
+
+# ============================================================================
+# Summarizing Many Websites
+# ============================================================================
+# Scraping and summarizing are both mostly waiting on the network, so
+# summarize_many() runs the whole fetch + LLM pipeline for every URL at once.
+# The total time is that of the slowest page, not the sum of all of them.
+# A page that fails comes back as its exception, so the other summaries are kept.
+# The HTTP and OpenAI clients are created per batch, because async clients are
+# tied to the event loop they were first used on. That is why summarize(), for a
+# single URL, takes the sync path instead: it reuses the kept-alive http_session
+# and OpenAI client rather than opening new connections on every call.
+# Embedding runs in a worker thread, so it doesn't hold up the other pages (the
+# first call also loads the embedding model, which takes several seconds).
+
+async def _summarize_async(url, client, async_openai):
+    """Fetch and summarize one website, with the same caches as stream_summary()."""
+    website = await fetch_website_contents_async(url, client)
+    embedding = await asyncio.to_thread(semantic_cache.embed, website)
+    summary = semantic_cache.lookup(embedding, url)
+    if summary is not None:
+        return summary
+
+    response = await cached_acreate(
+        async_openai,
         model="gpt-4o-mini",
         messages=messages_for(website)
     )
-    return response.choices[0].message.content
+    summary = response.choices[0].message.content
+    if summary:
+        semantic_cache.store(embedding, url, summary)
+    return summary
+
+
+async def summarize_many(urls):
+    """
+    Summarize several websites concurrently.
+
+    Returns a list in the same order as urls, holding each website's summary,
+    or the exception raised if that website couldn't be fetched or summarized.
+    """
+    async with (
+        httpx.AsyncClient(**http_client_settings) as client,
+        AsyncOpenAI() as async_openai,
+    ):
+        return await asyncio.gather(
+            *[_summarize_async(url, client, async_openai) for url in urls],
+            return_exceptions=True,
+        )
+
+
+def summarize(url):
+    """Summarize website content using OpenAI API."""
+    return "".join(stream_summary(url))
 
 # ============================================================================
 # Display Formatting
 # ============================================================================
-# For command-line execution, we use print() instead of IPython.display.Markdown
+# For command-line execution, we use print() instead of IPython.display.Markdown.
+# The summary is printed as it streams in, so the first words show up right away
+# instead of after the whole response has been generated.
 
 def display_summary(url):
     """Fetch summary and print it."""
-    summary = summarize(url)
-    print(summary)
+    for text in stream_summary(url):
+        print(text, end="", flush=True)
+    print()
 
 # ============================================================================
 # Example Usage